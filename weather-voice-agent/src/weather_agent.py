@@ -11,18 +11,28 @@ Key Components:
 - Open-Meteo API: Free weather data provider
 """
 
+import asyncio
+import contextlib
+import functools
+import json
 import os
-from typing import Dict, Any
+import tempfile
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple, TypedDict
 import httpx
+import orjson
 from dotenv import load_dotenv
 
-# Load environment variables from .env file for API credentials
-load_dotenv()
+# Load environment variables from .env file in parent directory, once at process start
+# This includes LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET, GOOGLE_API_KEY
+load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"), override=True)
 
 from livekit.agents import (
     Agent,              # Base class for voice agents
     AgentSession,       # Manages the voice session
     JobContext,         # Context for job execution
+    JobProcess,         # Worker process that runs jobs (used for prewarming)
     RunContext,         # Runtime context for tool execution
     WorkerOptions,      # Configuration for worker
     cli,                # Command-line interface
@@ -32,6 +42,174 @@ from livekit.agents import (
 from livekit.plugins import google  # Google Gemini integration
 
 
+# WMO Weather Code Mapping
+# These codes are part of the WMO (World Meteorological Organization) standard
+# They represent all possible weather conditions (0-99)
+_WMO_CODES: Dict[int, str] = {
+    0: "clear sky", 1: "mainly clear", 2: "partly cloudy", 3: "overcast",
+    45: "foggy", 48: "depositing rime fog",
+    51: "light drizzle", 53: "moderate drizzle", 55: "dense drizzle",
+    61: "slight rain", 63: "moderate rain", 65: "heavy rain",
+    71: "slight snow", 73: "moderate snow", 75: "heavy snow",
+    77: "snow grains", 80: "slight rain showers", 81: "moderate rain showers",
+    82: "violent rain showers", 85: "slight snow showers", 86: "heavy snow showers",
+    95: "thunderstorm", 96: "thunderstorm with slight hail", 99: "thunderstorm with heavy hail"
+}
+
+# Description used for any code missing from the table, in current conditions and forecasts alike
+_UNKNOWN_CONDITIONS = "unknown conditions"
+
+# Dense lookup table indexed directly by WMO code, built once at import
+_WMO_ARRAY: Tuple[str, ...] = tuple(_WMO_CODES.get(i, _UNKNOWN_CONDITIONS) for i in range(100))
+
+
+class ForecastDay(TypedDict):
+    """
+    One day of forecast data returned by lookup_weather.
+    """
+    date: str
+    description: str
+    max_temp: Optional[float]
+    min_temp: Optional[float]
+
+
+class WeatherReport(TypedDict):
+    """
+    Weather data returned by lookup_weather and sent back to Gemini as the tool result.
+    """
+    city: str
+    country: str
+    temperature: Optional[float]
+    feels_like: Optional[float]
+    humidity: Optional[int]
+    description: str
+    units: str
+    forecast: List[ForecastDay]
+
+
+def _round1(value: Optional[float]) -> Optional[float]:
+    """
+    Round a temperature to one decimal, passing through missing (null) values.
+    """
+    return None if value is None else round(value, 1)
+
+
+# JSON decoder for Open-Meteo responses, bound once at import
+_json_loads = orjson.loads
+
+
+# Transient network failures that are reported to the user as a connection problem
+# Anything else (e.g. a malformed request) is a bug and propagates unchanged
+_NETWORK_ERRORS = (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError)
+_NETWORK_ERROR_MESSAGE = "Unable to connect to the weather service. Please check your internet connection and try again."
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    """
+    Create the pooled httpx client a job uses for all Open-Meteo requests.
+    
+    Reusing one pooled client keeps TCP/TLS connections alive between tool calls,
+    so repeat lookups skip the connection handshake entirely. HTTP/2 lets requests
+    to the same host share one multiplexed connection; httpx already advertises
+    gzip/deflate (and br when brotli is installed) for compressed responses.
+    
+    Each job owns its client and closes it on shutdown, so jobs sharing a
+    process never use a client another job has closed.
+    """
+    return httpx.AsyncClient(
+        timeout=10.0,
+        http2=True,
+        headers={"user-agent": "weather-voice-agent/1.0"},
+        limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+    )
+
+
+# Geocoding results cache: normalized city name -> (latitude, longitude, name, country)
+# A city's coordinates never change, so repeat lookups can skip the geocoding request
+_GEO_CACHE: Dict[str, Tuple[float, float, str, str]] = {}
+_GEO_CACHE_MAX_SIZE = 1024
+
+# Weather response cache: (normalized city, units, want_forecast, hour bucket) -> lookup_weather result
+# Open-Meteo refreshes its data hourly, so answers within the same hour are identical
+_WEATHER_CACHE: "OrderedDict[Tuple[str, str, bool, int], WeatherReport]" = OrderedDict()
+_WEATHER_CACHE_MAX_SIZE = 512
+_WEATHER_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "weather_agent.json")
+
+
+# Query counts per (normalized city, units, want_forecast), used to prefetch hot cities
+_CITY_COUNTER: "Counter[Tuple[str, str, bool]]" = Counter()
+_PREFETCH_TOP_N = 10
+_PREFETCH_INTERVAL = 15 * 60  # seconds
+_CITY_COUNTER_MAX_SIZE = 1024
+
+
+def _finish_inflight(
+    inflight: "Dict[Tuple[str, str, bool], asyncio.Future[WeatherReport]]",
+    key: Tuple[str, str, bool],
+    fetch: "asyncio.Future[WeatherReport]",
+) -> None:
+    """
+    Remove a finished lookup from an agent's in-flight map.
+    
+    The exception is retrieved here so asyncio doesn't log "Task exception was
+    never retrieved" when every caller was cancelled before the lookup failed.
+    """
+    if inflight.get(key) is fetch:
+        del inflight[key]
+    if not fetch.cancelled():
+        fetch.exception()
+
+
+def _store_weather(key: Tuple[str, str, bool, int], weather: WeatherReport) -> None:
+    """
+    Add a result to the weather cache, evicting the least recently used entry when full.
+    """
+    _WEATHER_CACHE[key] = weather
+    _WEATHER_CACHE.move_to_end(key)
+    if len(_WEATHER_CACHE) > _WEATHER_CACHE_MAX_SIZE:
+        _WEATHER_CACHE.popitem(last=False)
+
+
+def _load_weather_cache() -> None:
+    """
+    Restore still-fresh weather results persisted by a previous run.
+    """
+    try:
+        with open(_WEATHER_CACHE_PATH, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        current_hour = int(time.time() // 3600)
+        for city_key, units, want_forecast, hour, weather in entries:
+            # Entries from an earlier hour are stale, so only keep the current bucket
+            if hour == current_hour:
+                _store_weather((city_key, units, want_forecast, hour), weather)
+    except (OSError, TypeError, ValueError):
+        # Missing or corrupt cache file - start with an empty cache
+        return
+
+
+async def _save_weather_cache() -> None:
+    """
+    Persist the weather cache to disk. Registered as a job shutdown callback.
+    """
+    entries = [[*key, weather] for key, weather in _WEATHER_CACHE.items()]
+    cache_dir = os.path.dirname(_WEATHER_CACHE_PATH)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temp file and swap it in, so jobs shutting down at the same
+        # time never leave a partially written cache file behind
+        fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".weather_agent.", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(tmp_path, _WEATHER_CACHE_PATH)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        # The cache is only an optimization, so failing to write it is not an error
+        pass
+
+
 class WeatherAgent(Agent):
     """
     A voice-based weather assistant agent using LiveKit Agents.
@@ -39,39 +217,73 @@ class WeatherAgent(Agent):
     This agent:
     1. Receives voice input from users via LiveKit
     2. Uses Google Gemini to understand weather queries
-    3. Calls lookup_weather() to fetch real-time data
+    3. Calls lookup_weather_current() or lookup_weather_forecast() to fetch real-time data
     4. Responds with natural voice output
     
     The agent is configured with instructions that tell Gemini to use
-    the lookup_weather tool for weather queries.
+    the current-weather tool by default and the forecast tool only when asked.
     """
 
-    def __init__(self):
+    def __init__(self, http_client: httpx.AsyncClient):
         # Initialize with system instructions for Gemini AI
         super().__init__(
             instructions=(
-                "You are a weather assistant. For any weather question, you MUST use the 'lookup_weather' tool. "
-                "For current weather queries, respond ONLY with the temperature and weather condition (e.g., 'It is 25 degrees and sunny'). Keep it very brief. "
-                "However, if the user explicitly asks for a forecast or prediction for future days, you can provide those details."
+                "You are a weather assistant. For any weather question, you MUST use one of the weather tools. "
+                "For current weather queries, use the 'lookup_weather_current' tool and respond ONLY with the temperature and weather condition (e.g., 'It is 25 degrees and sunny'). Keep it very brief. "
+                "However, if the user explicitly asks for a forecast or prediction for future days, use the 'lookup_weather_forecast' tool and you can provide those details."
             ),
         )
+        self._client = http_client
+        # In-flight lookups per (normalized city, units, want_forecast), shared by concurrent callers
+        # Kept per agent so the futures always belong to this job's event loop
+        self._inflight: "Dict[Tuple[str, str, bool], asyncio.Future[WeatherReport]]" = {}
 
     @function_tool
-    async def lookup_weather(self, context: RunContext, city: str, units: str = "metric") -> Dict[str, Any]:
+    async def lookup_weather_current(self, context: RunContext, city: str, units: str = "metric") -> WeatherReport:
+        """
+        Look up the current weather for a given city.
+        
+        Use this tool for questions about the weather right now.
+        
+        Args:
+            context: Runtime context provided by LiveKit
+            city: The name of the city to get weather for (e.g., "London", "Tokyo")
+            units: Temperature units - 'metric' for Celsius (default), 'imperial' for Fahrenheit
+        """
+        return await self.lookup_weather(city, units)
+
+    @function_tool
+    async def lookup_weather_forecast(self, context: RunContext, city: str, units: str = "metric") -> WeatherReport:
+        """
+        Look up the current weather and the forecast for the next few days for a given city.
+        
+        Use this tool only when the user explicitly asks about future days.
+        
+        Args:
+            context: Runtime context provided by LiveKit
+            city: The name of the city to get weather for (e.g., "London", "Tokyo")
+            units: Temperature units - 'metric' for Celsius (default), 'imperial' for Fahrenheit
+        """
+        return await self.lookup_weather(city, units, want_forecast=True)
+
+    async def lookup_weather(
+        self, city: str, units: str = "metric", want_forecast: bool = False, record_query: bool = True
+    ) -> WeatherReport:
         """
-        Look up current weather information for a given city using Open-Meteo API.
+        Look up weather information for a given city using Open-Meteo API.
         
-        This function is exposed to Gemini AI as a tool. When the user asks about
-        weather, Gemini automatically calls this function with the extracted city name.
+        This backs the lookup_weather_current and lookup_weather_forecast tools
+        that are exposed to Gemini AI.
         
         The function performs a two-step process:
         1. Geocoding: Convert city name to coordinates using Open-Meteo Geocoding API
-        2. Weather Fetch: Get current weather for those coordinates
+        2. Weather Fetch: Get current weather (and optionally the daily forecast) for those coordinates
         
         Args:
-            context: Runtime context provided by LiveKit
             city: The name of the city to get weather for (e.g., "London", "Tokyo")
             units: Temperature units - 'metric' for Celsius (default), 'imperial' for Fahrenheit
+            want_forecast: Whether to also fetch the daily forecast for the next few days
+            record_query: Whether to count this lookup towards the prefetched hot cities
 
         Returns:
             Dictionary containing:
@@ -82,135 +294,273 @@ class WeatherAgent(Agent):
             - humidity: Relative humidity percentage
             - description: Human-readable weather description
             - units: Temperature unit (Celsius/Fahrenheit)
+            - forecast: Up to 5 days of forecast data (empty unless want_forecast is set)
         
         Raises:
             ToolError: If city not found, API is down, or network error occurs
         """
+        # Normalize the city once so "London", " london " and "LONDON" share cache entries
+        city_key = " ".join(city.casefold().split())
+        if not city_key:
+            raise ToolError("Please tell me which city you want the weather for.")
+        query_key = (city_key, units, want_forecast)
+        
+        # Serve repeat queries within the same hour straight from the response cache
+        cache_key = (city_key, units, want_forecast, int(time.time() // 3600))
+        cached_weather = _WEATHER_CACHE.get(cache_key)
+        if cached_weather is not None:
+            _WEATHER_CACHE.move_to_end(cache_key)
+            weather = cached_weather
+        else:
+            # Collapse concurrent identical lookups onto a single in-flight request
+            fetch = self._inflight.get(query_key)
+            if fetch is None:
+                fetch = asyncio.ensure_future(self._fetch_weather(city, city_key, units, want_forecast, cache_key))
+                self._inflight[query_key] = fetch
+                fetch.add_done_callback(functools.partial(_finish_inflight, self._inflight, query_key))
+            # Shield the shared request so one cancelled caller doesn't cancel it for the others
+            weather = await asyncio.shield(fetch)
+        
+        # Only successful lookups are counted, so misspelled cities never become prefetch targets
+        if record_query:
+            _CITY_COUNTER[query_key] += 1
+        return weather
+
+    async def cancel_lookups(self) -> None:
+        """
+        Cancel in-flight weather fetches and wait for them to finish.
+        
+        Called on shutdown before the HTTP client is closed.
+        """
+        pending = list(self._inflight.values())
+        for fetch in pending:
+            fetch.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _fetch_weather(
+        self, city: str, city_key: str, units: str, want_forecast: bool, cache_key: Tuple[str, str, bool, int]
+    ) -> WeatherReport:
+        """
+        Fetch weather from Open-Meteo and store the result in the weather cache.
+        
+        Args:
+            city: The city name as given by the user, used in error messages
+            city_key: The normalized city name
+            units: Temperature units - 'metric' for Celsius, 'imperial' for Fahrenheit
+            want_forecast: Whether to also fetch the daily forecast for the next few days
+            cache_key: Weather cache key to store the result under
+        """
         # Step 1: Geocoding - Convert city name to coordinates
         # Using Open-Meteo's free geocoding API (no authentication required)
-        geocoding_url = f"https://geocoding-api.open-meteo.com/v1/search?name={city}&count=1&language=en&format=json"
+        # Query parameters are passed via params= so httpx URL-encodes them (e.g. "New York")
+        geocoding_url = "https://geocoding-api.open-meteo.com/v1/search"
+        geocoding_params = {"name": city_key, "count": 1, "language": "en", "format": "json"}
         
-        async with httpx.AsyncClient(timeout=10.0) as client:
+        # Reuse the pooled client instead of opening a new connection per call
+        # Its bound get method is kept in a local to skip repeated attribute lookups
+        get = self._client.get
+        cached_location = _GEO_CACHE.get(city_key)
+        if cached_location is not None:
+            # Cache hit - skip the geocoding round-trip
+            latitude, longitude, city_name, country = cached_location
+        else:
+            # Make geocoding API request
             try:
-                # Make geocoding API request
-                geo_response = await client.get(geocoding_url)
-                if geo_response.status_code != 200:
-                    raise ToolError(f"Could not find location for '{city}'. Please try another city.")
-                
-                geo_data = geo_response.json()
-                if not geo_data.get("results"):
-                    raise ToolError(f"I couldn't find a city called '{city}'. Please check the spelling or try another city.")
-                
-                # Extract coordinates and location info from first result
-                result = geo_data["results"][0]
-                latitude = result["latitude"]
-                longitude = result["longitude"]
-                city_name = result.get("name", city)
-                country = result.get("country", "")
-                
-                # Step 2: Weather Fetch - Get current weather AND daily forecast
-                # We add 'daily' parameters to get max/min temps and weather codes for the next few days
-                # We also add 'timezone=auto' to get the correct dates for the location
-                weather_url = f"https://api.open-meteo.com/v1/forecast?latitude={latitude}&longitude={longitude}&current=temperature_2m,apparent_temperature,weather_code,relative_humidity_2m&daily=weather_code,temperature_2m_max,temperature_2m_min&timezone=auto&temperature_unit={'celsius' if units == 'metric' else 'fahrenheit'}"
-                
-                weather_response = await client.get(weather_url)
-                if weather_response.status_code != 200:
-                    raise ToolError("The weather service is temporarily unavailable. Please try again later.")
-                
-                weather_data = weather_response.json()
-                current = weather_data["current"]
-                daily = weather_data.get("daily", {})
-                
-                # WMO Weather Code Mapping
-                # These codes are part of the WMO (World Meteorological Organization) standard
-                # They represent all possible weather conditions (0-99)
-                wmo_codes = {
-                    0: "clear sky", 1: "mainly clear", 2: "partly cloudy", 3: "overcast",
-                    45: "foggy", 48: "depositing rime fog",
-                    51: "light drizzle", 53: "moderate drizzle", 55: "dense drizzle",
-                    61: "slight rain", 63: "moderate rain", 65: "heavy rain",
-                    71: "slight snow", 73: "moderate snow", 75: "heavy snow",
-                    77: "snow grains", 80: "slight rain showers", 81: "moderate rain showers",
-                    82: "violent rain showers", 85: "slight snow showers", 86: "heavy snow showers",
-                    95: "thunderstorm", 96: "thunderstorm with slight hail", 99: "thunderstorm with heavy hail"
-                }
-                
-                # Convert WMO code to human-readable description
-                weather_code = int(current["weather_code"])
-                description = wmo_codes.get(weather_code, "unknown conditions")
-                
-                # Process forecast data
-                forecast = []
-                if daily:
-                    times = daily.get("time", [])
-                    codes = daily.get("weather_code", [])
-                    max_temps = daily.get("temperature_2m_max", [])
-                    min_temps = daily.get("temperature_2m_min", [])
-                    
-                    for i in range(min(len(times), 5)):  # Get up to 5 days
-                        code = int(codes[i])
-                        forecast.append({
-                            "date": times[i],
-                            "description": wmo_codes.get(code, "unknown"),
-                            "max_temp": max_temps[i],
-                            "min_temp": min_temps[i]
-                        })
-
-                # Return formatted weather data as a dictionary
-                return {
-                    "city": city_name,
-                    "country": country,
-                    "temperature": current["temperature_2m"],
-                    "feels_like": current["apparent_temperature"],
-                    "humidity": current["relative_humidity_2m"],
-                    "description": description,
-                    "units": "Celsius" if units == "metric" else "Fahrenheit",
-                    "forecast": forecast
-                }
-            except httpx.RequestError:
+                geo_response = await get(geocoding_url, params=geocoding_params)
+            except _NETWORK_ERRORS:
                 # Network error - likely no internet connection
-                raise ToolError("Unable to connect to the weather service. Please check your internet connection and try again.")
+                raise ToolError(_NETWORK_ERROR_MESSAGE) from None
+            try:
+                geo_response.raise_for_status()
+            except httpx.HTTPStatusError:
+                raise ToolError(f"Could not find location for '{city}'. Please try another city.") from None
+            
+            geo_data = _json_loads(geo_response.content)
+            if not geo_data.get("results"):
+                raise ToolError(f"I couldn't find a city called '{city}'. Please check the spelling or try another city.")
+            
+            # Extract coordinates and location info from first result
+            result = geo_data["results"][0]
+            latitude = result["latitude"]
+            longitude = result["longitude"]
+            city_name = result.get("name", city)
+            country = result.get("country", "")
+            
+            # Remember the location, evicting the oldest entry once the cache is full
+            if len(_GEO_CACHE) >= _GEO_CACHE_MAX_SIZE:
+                _GEO_CACHE.pop(next(iter(_GEO_CACHE)))
+            _GEO_CACHE[city_key] = (latitude, longitude, city_name, country)
+        
+        # Step 2: Weather Fetch - Get current weather and, if requested, the daily forecast
+        # The 'daily' parameters (max/min temps and weather codes for the next few days) are
+        # only requested for forecast queries, keeping current-only responses small
+        # We also add 'timezone=auto' to get the correct dates for the location
+        weather_url = "https://api.open-meteo.com/v1/forecast"
+        weather_params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "current": "temperature_2m,apparent_temperature,weather_code,relative_humidity_2m",
+            "timezone": "auto",
+            "temperature_unit": "celsius" if units == "metric" else "fahrenheit",
+        }
+        if want_forecast:
+            weather_params["daily"] = "weather_code,temperature_2m_max,temperature_2m_min"
+        
+        try:
+            weather_response = await get(weather_url, params=weather_params)
+        except _NETWORK_ERRORS:
+            # Network error - likely no internet connection
+            raise ToolError(_NETWORK_ERROR_MESSAGE) from None
+        try:
+            weather_response.raise_for_status()
+        except httpx.HTTPStatusError:
+            raise ToolError("The weather service is temporarily unavailable. Please try again later.") from None
+        
+        weather_data = _json_loads(weather_response.content)
+        current = weather_data["current"]
+        daily = weather_data.get("daily", {})
+        
+        # Convert WMO code to human-readable description
+        weather_code = int(current["weather_code"])
+        description = _WMO_ARRAY[weather_code] if 0 <= weather_code < 100 else _UNKNOWN_CONDITIONS
+        
+        # Process forecast data
+        forecast: List[ForecastDay] = []
+        if daily:
+            times = daily.get("time", [])
+            codes = daily.get("weather_code", [])
+            max_temps = daily.get("temperature_2m_max", [])
+            min_temps = daily.get("temperature_2m_min", [])
+            
+            # Build the per-day entries in a single pass over the zipped daily arrays
+            # The WMO table is bound to a local to avoid a global lookup per day
+            days = min(len(times), 5)  # Get up to 5 days
+            wmo = _WMO_ARRAY
+            forecast = [
+                {
+                    "date": date,
+                    "description": wmo[code] if 0 <= code < 100 else _UNKNOWN_CONDITIONS,
+                    "max_temp": _round1(max_temp),
+                    "min_temp": _round1(min_temp)
+                }
+                for date, code, max_temp, min_temp in zip(
+                    times[:days], map(int, codes[:days]), max_temps[:days], min_temps[:days]
+                )
+            ]
 
+        # Return formatted weather data as a dictionary
+        # Temperatures are rounded to one decimal to keep the serialized tool result short
+        weather: WeatherReport = {
+            "city": city_name,
+            "country": country,
+            "temperature": _round1(current["temperature_2m"]),
+            "feels_like": _round1(current["apparent_temperature"]),
+            "humidity": current["relative_humidity_2m"],
+            "description": description,
+            "units": "Celsius" if units == "metric" else "Fahrenheit",
+            "forecast": forecast
+        }
+        _store_weather(cache_key, weather)
+        return weather
 
-async def entrypoint(ctx: JobContext):
+
+async def _prefetch_hot_cities(agent: WeatherAgent) -> None:
     """
-    Entrypoint function for the LiveKit agent worker.
+    Keep the weather cache warm for the most frequently requested cities.
     
-    This function is called when a new job is started. It:
-    1. Loads environment variables (API credentials)
-    2. Connects to the LiveKit room
-    3. Creates a Gemini Realtime session for voice processing
-    4. Initializes the weather agent
-    5. Sends an initial greeting
-    
-    Args:
-        ctx: JobContext containing room information and configuration
+    Every few minutes, looks up the top cities so that a new hour's data is
+    fetched in the background instead of on the user's critical path.
     """
-    # Load environment variables from .env file in parent directory
-    # This includes LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET, GOOGLE_API_KEY
-    env_path = os.path.join(os.path.dirname(__file__), "..", ".env")
-    load_dotenv(env_path, override=True)
+    while True:
+        await asyncio.sleep(_PREFETCH_INTERVAL)
+        hot_queries = _CITY_COUNTER.most_common(_PREFETCH_TOP_N)
+        # Drop the long tail of rarely asked cities so the counter stays bounded
+        if len(_CITY_COUNTER) > _CITY_COUNTER_MAX_SIZE:
+            kept = _CITY_COUNTER.most_common(_CITY_COUNTER_MAX_SIZE)
+            _CITY_COUNTER.clear()
+            _CITY_COUNTER.update(dict(kept))
+        # Lookups already cached for this hour return immediately; failures are ignored
+        await asyncio.gather(
+            *[
+                agent.lookup_weather(city_key, units, want_forecast, record_query=False)
+                for (city_key, units, want_forecast), _ in hot_queries
+            ],
+            return_exceptions=True,
+        )
 
-    # Connect to the LiveKit room
-    await ctx.connect()
 
-    # Create a session with Google Gemini Realtime API for voice
+def prewarm(proc: JobProcess):
+    """
+    Prewarm function for the LiveKit agent worker.
+    
+    This function runs once per worker process before it accepts jobs, so
+    expensive setup is kept off the critical path of each new session. It:
+    1. Creates the Gemini Realtime model shared by jobs in this process
+    2. Warms the weather cache from the previous run
+    
+    Args:
+        proc: JobProcess whose userdata is shared with every job it runs
+    """
+    # Create the Google Gemini Realtime model for voice
     # This enables:
     # - Speech-to-Text: Converts user voice to text
     # - LLM Processing: Understands user intent and calls tools
     # - Text-to-Speech: Converts response back to voice
+    proc.userdata["llm"] = google.realtime.RealtimeModel(
+        voice="Puck",  # Available voices: Puck, Breeze, Charon, Juniper, Orion
+    )
+
+    # Warm the weather cache from the previous run
+    _load_weather_cache()
+
+
+async def entrypoint(ctx: JobContext):
+    """
+    Entrypoint function for the LiveKit agent worker.
+    
+    This function is called when a new job is started. It:
+    1. Creates a Gemini Realtime session using the prewarmed model
+    2. Initializes the weather agent
+    3. Starts the session, connecting to the LiveKit room alongside the Gemini handshake
+    4. Sends an initial greeting
+    
+    Args:
+        ctx: JobContext containing room information and configuration
+    """
+    # Create a session with the Gemini Realtime model built in prewarm()
     session = AgentSession(
-        llm=google.realtime.RealtimeModel(
-            voice="Puck",  # Available voices: Puck, Breeze, Charon, Juniper, Orion
-        ),
+        llm=ctx.proc.userdata["llm"],
     )
 
-    # Create an instance of our custom weather agent
-    agent = WeatherAgent()
+    # Create an instance of our custom weather agent with this job's own HTTP client
+    http_client = _create_http_client()
+    agent = WeatherAgent(http_client)
+
+    # Refresh the most requested cities in the background and stop when the job ends
+    prefetch_task = asyncio.create_task(_prefetch_hot_cities(agent))
+
+    async def _stop_prefetch() -> None:
+        prefetch_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await prefetch_task
+        # Shielded fetches outlive the cancelled prefetch, so stop them as well
+        await agent.cancel_lookups()
+
+    ctx.add_shutdown_callback(_stop_prefetch)
+
+    # Release pooled HTTP connections when the job ends
+    # Registered after _stop_prefetch, which waits for all lookups, so none run against a closed client
+    ctx.add_shutdown_callback(http_client.aclose)
+
+    # Persist the weather cache on shutdown so the next run starts warm
+    ctx.add_shutdown_callback(_save_weather_cache)
 
     # Start the agent session in the room
+    # The session connects to the room itself while the Gemini realtime session is set up,
+    # so the two network handshakes overlap; the explicit connect below is then a no-op
     # The agent will now listen for incoming audio and respond
     await session.start(agent=agent, room=ctx.room)
+    await ctx.connect()
 
     # Send initial greeting message to the user
     await session.generate_reply(
@@ -228,4 +578,4 @@ async def entrypoint(ctx: JobContext):
 if __name__ == "__main__":
     # Run the app as a LiveKit worker
     # The CLI handles parsing arguments (dev, start, etc.)
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint))
\ No newline at end of file
+    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
\ No newline at end of file